@@ -5,19 +5,34 @@ import argparse
 import json
 import re
 import sqlite3
+import threading
 import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
 from html import unescape
 from pathlib import Path
-from typing import Dict, Iterable, List, Optional, Tuple
+from typing import Deque, Dict, Iterable, List, Optional, Tuple
 
 import requests
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 CONFIG_PATH = Path(__file__).parent.parent / "user.json"
 DB_PATH = Path(__file__).parent.parent / "tapedeck.db"
 TMDB_IMAGE_BASE = "https://image.tmdb.org/t/p/original"
 REQUEST_TIMEOUT = 20
+API_WORKERS = 4
+COMMIT_INTERVAL = 50
+LOOKUP_WINDOW = API_WORKERS * 4
 SUMMARY_RE = re.compile(r"<[^>]+>")
+PUNCTUATION_RE = re.compile(r"[^\w\s]")
 TVDB_API = "https://api4.thetvdb.com/v4"
+TVMAZE_API = "https://api.tvmaze.com"
+TVMAZE_CALLS_PER_WINDOW = 20
+TVMAZE_WINDOW_SECONDS = 10.0
 
 ORIGIN_DOMAINS = {
     "amazon": ("amazon.com", "primevideo.com", "images-amazon.com"),
@@ -82,24 +97,35 @@ def call_json(
     if response.status_code != 200:
         return None
     try:
+        if orjson is not None:
+            return orjson.loads(response.content)
         return response.json()
     except ValueError:
         return None
 
 
+def dig(data: object, *keys: object) -> object:
+    try:
+        for key in keys:
+            data = data[key]
+    except (KeyError, IndexError, TypeError):
+        return None
+    return data
+
+
 def choose_result(results: List[dict], target: str) -> Optional[dict]:
     if not results:
         return None
     if len(results) == 1:
         return results[0]
 
-    normalized_target = re.sub(r"[^\w\s]", "", target.lower())
+    normalized_target = PUNCTUATION_RE.sub("", target.lower())
     best: Optional[dict] = None
     best_score = -1
 
     for item in results:
         name = item.get("name") or item.get("title") or item.get("original_name") or item.get("original_title") or ""
-        normalized_name = re.sub(r"[^\w\s]", "", name.lower())
+        normalized_name = PUNCTUATION_RE.sub("", name.lower())
         score = 0
 
         if normalized_name == normalized_target:
@@ -145,21 +171,58 @@ def should_preserve_image(existing: str, source: str) -> bool:
     return any(domain in lowered for domain in domains)
 
 
+class RateLimiter:
+    """Allow bursts of up to ``calls`` requests in any ``period`` second window."""
+
+    def __init__(self, calls: int, period: float) -> None:
+        self.calls = calls
+        self.period = period
+        self._stamps: Deque[float] = deque()
+        self._lock = threading.Lock()
+
+    def wait(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            while self._stamps and now - self._stamps[0] >= self.period:
+                self._stamps.popleft()
+            if len(self._stamps) >= self.calls:
+                time.sleep(self.period - (now - self._stamps.popleft()))
+            self._stamps.append(time.monotonic())
+
+
 class TvMazeCache:
-    """Cache TVMaze lookups so we do minimal HTTP requests."""
+    """Cache TVMaze lookups so we do minimal HTTP requests; shared across worker threads."""
 
     def __init__(self) -> None:
         self.show_by_title: Dict[str, dict] = {}
         self.show_by_id: Dict[int, dict] = {}
         self.seasons: Dict[int, Dict[int, dict]] = {}
-        self.episodes: Dict[Tuple[int, int, int], Optional[dict]] = {}
+        self.episodes: Dict[int, Dict[Tuple[int, int], dict]] = {}
+        self.limiter = RateLimiter(TVMAZE_CALLS_PER_WINDOW, TVMAZE_WINDOW_SECONDS)
+        self.lock = threading.Lock()
+        self._key_locks: Dict[tuple, threading.Lock] = {}
+
+    def key_lock(self, *key: object) -> threading.Lock:
+        with self.lock:
+            return self._key_locks.setdefault(key, threading.Lock())
 
     def store_show(self, show: Optional[dict]) -> None:
         if not show:
             return
         identifier = show.get("id")
         if isinstance(identifier, int):
-            self.show_by_id[identifier] = show
+            with self.lock:
+                self.show_by_id[identifier] = show
+
+
+def tvmaze_json(
+    session: requests.Session,
+    cache: TvMazeCache,
+    path: str,
+    params: Optional[Dict[str, str]] = None,
+) -> Optional[dict]:
+    cache.limiter.wait()
+    return call_json(session, "get", f"{TVMAZE_API}{path}", params=params)
 
 
 def tvmaze_show(
@@ -174,41 +237,71 @@ def tvmaze_show(
         except (TypeError, ValueError):
             show_id = None
         if show_id is not None:
-            if show_id not in cache.show_by_id:
-                data = call_json(session, "get", f"https://api.tvmaze.com/shows/{show_id}", params={"embed": "cast"})
-                cache.store_show(data)
+            with cache.key_lock("show", show_id):
+                if show_id not in cache.show_by_id:
+                    data = tvmaze_json(session, cache, f"/shows/{show_id}", params={"embed": "cast"})
+                    cache.store_show(data)
             return cache.show_by_id.get(show_id)
 
     key = title.lower()
-    if key not in cache.show_by_title:
-        data = call_json(
-            session,
-            "get",
-            "https://api.tvmaze.com/singlesearch/shows",
-            params={"q": title, "embed": "cast"},
-        )
-        cache.show_by_title[key] = data or {}
-        cache.store_show(data)
+    with cache.key_lock("title", key):
+        if key not in cache.show_by_title:
+            data = tvmaze_json(session, cache, "/singlesearch/shows", params={"q": title, "embed": "cast"})
+            with cache.lock:
+                cache.show_by_title[key] = data or {}
+            cache.store_show(data)
     show = cache.show_by_title.get(key)
     return show if show else None
 
 
+def tvmaze_seasons(session: requests.Session, cache: TvMazeCache, show_id: int) -> Optional[Dict[int, dict]]:
+    with cache.key_lock("seasons", show_id):
+        if show_id not in cache.seasons:
+            data = tvmaze_json(session, cache, f"/shows/{show_id}/seasons")
+            if data is None:
+                return None
+            seasons: Dict[int, dict] = {}
+            for entry in data:
+                try:
+                    idx = int(entry.get("number"))
+                except (TypeError, ValueError):
+                    continue
+                seasons[idx] = entry
+            with cache.lock:
+                cache.seasons[show_id] = seasons
+    return cache.seasons[show_id]
+
+
+def tvmaze_episodes(
+    session: requests.Session,
+    cache: TvMazeCache,
+    show_id: int,
+) -> Optional[Dict[Tuple[int, int], dict]]:
+    with cache.key_lock("episodes", show_id):
+        if show_id not in cache.episodes:
+            data = tvmaze_json(session, cache, f"/shows/{show_id}/episodes")
+            if data is None:
+                return None
+            index: Dict[Tuple[int, int], dict] = {}
+            for entry in data:
+                try:
+                    key = (int(entry.get("season")), int(entry.get("number")))
+                except (TypeError, ValueError):
+                    continue
+                index[key] = entry
+            with cache.lock:
+                cache.episodes[show_id] = index
+    return cache.episodes[show_id]
+
+
 def tvmaze_season(
     session: requests.Session,
     cache: TvMazeCache,
     show_id: int,
     number: int,
 ) -> Optional[dict]:
-    seasons = cache.seasons.setdefault(show_id, {})
-    if number not in seasons:
-        data = call_json(session, "get", f"https://api.tvmaze.com/shows/{show_id}/seasons") or []
-        for entry in data:
-            try:
-                idx = int(entry.get("number"))
-            except (TypeError, ValueError):
-                continue
-            seasons[idx] = entry
-    return seasons.get(number)
+    seasons = tvmaze_seasons(session, cache, show_id)
+    return seasons.get(number) if seasons is not None else None
 
 
 def tvmaze_episode(
@@ -218,54 +311,51 @@ def tvmaze_episode(
     season: int,
     episode: int,
 ) -> Optional[dict]:
-    key = (show_id, season, episode)
-    if key not in cache.episodes:
-        cache.episodes[key] = call_json(
-            session,
-            "get",
-            f"https://api.tvmaze.com/shows/{show_id}/episodebynumber",
-            params={"season": season, "number": episode},
-        )
-    return cache.episodes.get(key)
+    episodes = tvmaze_episodes(session, cache, show_id)
+    return episodes.get((season, episode)) if episodes is not None else None
 
 
 class TvdbClient:
     """Minimal TVDB v4 client; silently fails when the API is unreachable."""
 
-    def __init__(self, api_key: Optional[str], session: requests.Session) -> None:
+    def __init__(self, api_key: Optional[str]) -> None:
         self.api_key = clean_value(api_key)
-        self.session = session
         self._token: Optional[str] = None
         self._token_timestamp: float = 0.0
+        self._lock = threading.Lock()
 
-    def _ensure_token(self) -> Optional[str]:
+    def _ensure_token(self, session: requests.Session) -> Optional[str]:
         if not self.api_key:
             return None
+        with self._lock:
+            return self._refresh_token(session)
+
+    def _refresh_token(self, session: requests.Session) -> Optional[str]:
         now = time.time()
         if self._token and now - self._token_timestamp < 3600:
             return self._token
-        data = call_json(self.session, "post", f"{TVDB_API}/login", json_body={"apikey": self.api_key})
+        data = call_json(session, "post", f"{TVDB_API}/login", json_body={"apikey": self.api_key})
         if not data:
             return None
-        token = data.get("data", {}).get("token")
+        token = dig(data, "data", "token")
         if not token:
             return None
         self._token = token
         self._token_timestamp = now
         return token
 
-    def _authorized_headers(self) -> Optional[Dict[str, str]]:
-        token = self._ensure_token()
+    def _authorized_headers(self, session: requests.Session) -> Optional[Dict[str, str]]:
+        token = self._ensure_token(session)
         if not token:
             return None
         return {"Authorization": f"Bearer {token}"}
 
-    def search_series(self, title: str) -> Optional[dict]:
-        headers = self._authorized_headers()
+    def search_series(self, session: requests.Session, title: str) -> Optional[dict]:
+        headers = self._authorized_headers(session)
         if not headers or not title:
             return None
         data = call_json(
-            self.session,
+            session,
             "get",
             f"{TVDB_API}/search",
             params={"query": title, "type": "series"},
@@ -279,12 +369,12 @@ class TvdbClient:
         best = choose_result(results, title)
         return best or results[0]
 
-    def series_details(self, series_id: Optional[int]) -> Optional[dict]:
-        headers = self._authorized_headers()
+    def series_details(self, session: requests.Session, series_id: Optional[int]) -> Optional[dict]:
+        headers = self._authorized_headers(session)
         if not headers or series_id is None:
             return None
         data = call_json(
-            self.session,
+            session,
             "get",
             f"{TVDB_API}/series/{series_id}",
             headers=headers,
@@ -515,16 +605,15 @@ def update_tables(
     id_updates: Dict[str, str],
     import_cols: set,
 ) -> None:
-    if updates:
-        assignments = ", ".join(f"{column} = ?" for column in updates)
-        values = list(updates.values()) + [checksum]
+    online_updates = dict(updates)
+    for key, value in id_updates.items():
+        if key in {"imdb", "tmdb", "tvmaze", "tvdb"}:
+            online_updates[key] = value
+    if online_updates:
+        assignments = ", ".join(f"{column} = ?" for column in online_updates)
+        values = list(online_updates.values()) + [checksum]
         conn.execute(f"UPDATE online SET {assignments} WHERE checksum = ?", values)
     if id_updates:
-        id_assignments = {key: value for key, value in id_updates.items() if key in {"imdb", "tmdb", "tvmaze", "tvdb"}}
-        if id_assignments:
-            assignments = ", ".join(f"{column} = ?" for column in id_assignments)
-            values = list(id_assignments.values()) + [checksum]
-            conn.execute(f"UPDATE online SET {assignments} WHERE checksum = ?", values)
         import_updates = {key: value for key, value in id_updates.items() if key in import_cols}
         if import_updates:
             assignments = ", ".join(f"{column} = ?" for column in import_updates)
@@ -565,26 +654,25 @@ def update_movie_metadata(
     omdb_data = omdb_lookup(session, api_keys.get("OMDB"), ids.get("imdb"), title)
 
     existing = row.get
-    candidate = prefer_text(existing("current_dmovie", ""), (tmdb_data or {}).get("overview"))
+    candidate = prefer_text(existing("current_dmovie", ""), dig(tmdb_data, "overview"))
     if not candidate and omdb_data:
         candidate = prefer_text(existing("current_dmovie", ""), omdb_data.get("Plot"), min_gain=15)
     if candidate:
         updates["dmovie"] = candidate
 
-    candidate = prefer_simple(existing("current_release", ""), (tmdb_data or {}).get("release_date"))
+    candidate = prefer_simple(existing("current_release", ""), dig(tmdb_data, "release_date"))
     if not candidate and omdb_data:
         candidate = prefer_simple(existing("current_release", ""), omdb_data.get("Released"))
     if candidate:
         updates["release"] = candidate
 
-    companies = (tmdb_data or {}).get("production_companies") or []
-    studio = companies[0].get("name") if companies else ""
+    studio = dig(tmdb_data, "production_companies", 0, "name") or ""
     candidate = prefer_simple(existing("current_studio", ""), studio)
     if candidate:
         updates["studio"] = candidate
 
     genres: List[str] = []
-    genres.extend([genre.get("name", "") for genre in (tmdb_data or {}).get("genres") or []])
+    genres.extend([genre.get("name", "") for genre in dig(tmdb_data, "genres") or []])
     if omdb_data and clean_value(omdb_data.get("Genre")) and omdb_data.get("Genre") != "N/A":
         genres.extend(name.strip() for name in omdb_data["Genre"].split(","))
     candidate = prefer_list(existing("current_genre", ""), genres)
@@ -597,7 +685,7 @@ def update_movie_metadata(
             updates["rating"] = candidate
 
     tmdb_cast = []
-    for member in (tmdb_data or {}).get("credits", {}).get("cast", [])[:5]:
+    for member in (dig(tmdb_data, "credits", "cast") or [])[:5]:
         name = member.get("name")
         if name:
             tmdb_cast.append(name)
@@ -607,7 +695,7 @@ def update_movie_metadata(
     if candidate:
         updates["cast"] = candidate
 
-    poster_path = clean_value((tmdb_data or {}).get("poster_path"))
+    poster_path = clean_value(dig(tmdb_data, "poster_path"))
     poster = f"{TMDB_IMAGE_BASE}{poster_path}" if poster_path else ""
     source = clean_value(row.get("import_dlsource"))
     candidate = prefer_image(existing("current_imovie", ""), poster, source)
@@ -624,34 +712,28 @@ def update_movie_metadata(
     return updates, id_updates
 
 
-def update_tv_metadata(
-    row: Dict[str, str],
+def tv_title(row: Dict[str, str]) -> str:
+    return clean_value(row.get("import_series")) or clean_value(row.get("import_movie")) or clean_value(row.get("import_title"))
+
+
+def lookup_series(
+    title: str,
+    ids: Dict[str, str],
     session: requests.Session,
     api_keys: Dict[str, str],
     cache: TvMazeCache,
     tvdb_client: Optional[TvdbClient],
-) -> Tuple[Dict[str, str], Dict[str, str]]:
-    title = clean_value(row.get("import_series")) or clean_value(row.get("import_movie")) or clean_value(row.get("import_title"))
-    if not title:
-        return {}, {}
-
-    ids = gather_ids(row)
-    updates: Dict[str, str] = {}
-    id_updates: Dict[str, str] = {}
+) -> Dict[str, object]:
+    ids = dict(ids)
 
     show = tvmaze_show(session, cache, title, ids.get("tvmaze"))
-    if show:
-        show_id = show.get("id")
-        if show_id and str(show_id) != ids.get("tvmaze"):
-            ids["tvmaze"] = str(show_id)
-            id_updates["tvmaze"] = str(show_id)
-    else:
-        show_id = None
+    show_id = show.get("id") if show else None
+    if show_id:
+        ids["tvmaze"] = str(show_id)
 
     tmdb_id, tmdb_data = tmdb_tv_details(session, api_keys.get("TMDB"), title, ids.get("tmdb"))
-    if tmdb_id and tmdb_id != ids.get("tmdb"):
+    if tmdb_id:
         ids["tmdb"] = tmdb_id
-        id_updates["tmdb"] = tmdb_id
 
     tvdb_data = None
     tvdb_series_id = None
@@ -662,33 +744,54 @@ def update_tv_metadata(
             except ValueError:
                 tvdb_series_id = None
         if tvdb_series_id is None:
-            series = tvdb_client.search_series(title)
+            series = tvdb_client.search_series(session, title)
             if series:
                 tvdb_series_id = series.get("id")
                 if tvdb_series_id:
                     ids["tvdb"] = str(tvdb_series_id)
-                    id_updates["tvdb"] = str(tvdb_series_id)
         if tvdb_series_id is not None:
-            tvdb_data = tvdb_client.series_details(tvdb_series_id)
+            tvdb_data = tvdb_client.series_details(session, tvdb_series_id)
 
     imdb_id = ids.get("imdb")
-    externals = (tmdb_data or {}).get("external_ids", {})
     if not imdb_id:
-        imdb_id = clean_value(externals.get("imdb_id"))
-    if not imdb_id and show:
-        imdb_id = clean_value(show.get("externals", {}).get("imdb"))
-    if imdb_id and imdb_id != ids.get("imdb"):
+        imdb_id = clean_value(dig(tmdb_data, "external_ids", "imdb_id"))
+    if not imdb_id:
+        imdb_id = clean_value(dig(show, "externals", "imdb"))
+    if imdb_id:
         ids["imdb"] = imdb_id
-        id_updates["imdb"] = imdb_id
 
     omdb_data = omdb_lookup(session, api_keys.get("OMDB"), imdb_id, title)
 
+    return {
+        "ids": ids,
+        "show": show,
+        "show_id": show_id,
+        "tmdb": tmdb_data,
+        "tvdb": tvdb_data,
+        "omdb": omdb_data,
+    }
+
+
+def update_tv_metadata(
+    row: Dict[str, str],
+    series: Dict[str, object],
+    session: requests.Session,
+    cache: TvMazeCache,
+) -> Tuple[Dict[str, str], Dict[str, str]]:
+    ids: Dict[str, str] = series["ids"]
+    show = series["show"]
+    show_id = series["show_id"]
+    tmdb_data = series["tmdb"]
+    tvdb_data = series["tvdb"]
+    omdb_data = series["omdb"]
+    updates: Dict[str, str] = {}
+
     current = row.get
     series_summary = prioritized_summary(
-        (tvdb_data or {}).get("overview") if tvdb_data else None,
-        show.get("summary") if show else None,
-        (omdb_data or {}).get("Plot") if omdb_data else None,
-        (tmdb_data or {}).get("overview") if tmdb_data else None,
+        dig(tvdb_data, "overview"),
+        dig(show, "summary"),
+        dig(omdb_data, "Plot"),
+        dig(tmdb_data, "overview"),
     )
     candidate = prefer_text(current("current_dseries", ""), series_summary, min_gain=10)
     if candidate:
@@ -717,8 +820,7 @@ def update_tv_metadata(
         candidate = prefer_text(current("current_dseason", ""), season_summary, min_gain=10)
         if candidate:
             updates["dseason"] = candidate
-        season_image = season.get("image") or {}
-        art = clean_value(season_image.get("original")) or clean_value(season_image.get("medium"))
+        art = clean_value(dig(season, "image", "original")) or clean_value(dig(season, "image", "medium"))
         candidate = prefer_image(current("current_iseason", ""), art, source)
         if candidate:
             updates["iseason"] = candidate
@@ -735,16 +837,14 @@ def update_tv_metadata(
         candidate = prefer_simple(current("current_airdate", ""), episode.get("airdate"))
         if candidate:
             updates["airdate"] = candidate
-        ep_image = episode.get("image") or {}
-        art = clean_value(ep_image.get("original")) or clean_value(ep_image.get("medium"))
+        art = clean_value(dig(episode, "image", "original")) or clean_value(dig(episode, "image", "medium"))
         candidate = prefer_image(current("current_iepisode", ""), art, source)
         if candidate:
             updates["iepisode"] = candidate
 
     networks: List[str] = []
     if tvdb_data:
-        network = tvdb_data.get("primaryNetwork") or {}
-        networks.append(clean_value(network.get("name")))
+        networks.append(clean_value(dig(tvdb_data, "primaryNetwork", "name")))
     if show:
         net = show.get("network") or show.get("webChannel") or {}
         networks.append(clean_value(net.get("name")))
@@ -779,14 +879,11 @@ def update_tv_metadata(
 
     cast_names: List[str] = []
     if show:
-        cast = show.get("_embedded", {}).get("cast") or []
-        for member in cast:
-            person = member.get("person") or {}
-            name = clean_value(person.get("name"))
+        for member in dig(show, "_embedded", "cast") or []:
+            name = clean_value(dig(member, "person", "name"))
             if name:
                 cast_names.append(name)
-    credits = (tmdb_data or {}).get("credits", {}).get("cast") or []
-    for member in credits[:5]:
+    for member in (dig(tmdb_data, "credits", "cast") or [])[:5]:
         name = clean_value(member.get("name"))
         if name:
             cast_names.append(name)
@@ -796,8 +893,7 @@ def update_tv_metadata(
 
     show_image = ""
     if show:
-        image_data = show.get("image") or {}
-        show_image = clean_value(image_data.get("original")) or clean_value(image_data.get("medium"))
+        show_image = clean_value(dig(show, "image", "original")) or clean_value(dig(show, "image", "medium"))
     if not show_image and tmdb_data:
         poster_path = clean_value(tmdb_data.get("poster_path"))
         if poster_path:
@@ -806,21 +902,22 @@ def update_tv_metadata(
     if candidate:
         updates["iseries"] = candidate
 
-    if ids.get("imdb"):
-        id_updates.setdefault("imdb", ids["imdb"])
-    if ids.get("tvdb"):
-        id_updates.setdefault("tvdb", ids["tvdb"])
-    if ids.get("tvmaze"):
-        id_updates.setdefault("tvmaze", ids["tvmaze"])
-    if ids.get("tmdb"):
-        id_updates.setdefault("tmdb", ids["tmdb"])
+    id_updates = {key: value for key, value in ids.items() if value}
 
     return updates, id_updates
 
 
+def row_kind(data: Dict[str, str]) -> str:
+    torrent_type = clean_value(
+        data.get("import_torrenttype") or data.get("current_torrenttype") or data.get("torrenttype")
+    ).lower()
+    if torrent_type not in {"movie", "tv", "series"}:
+        torrent_type = "tv" if clean_value(data.get("import_series")) else "movie"
+    return "movie" if torrent_type == "movie" else "tv"
+
+
 def process_rows(
     conn: sqlite3.Connection,
-    session: requests.Session,
     api_keys: Dict[str, str],
     verbose: bool,
 ) -> None:
@@ -832,28 +929,47 @@ def process_rows(
     query, aliases = build_column_query(import_cols, online_cols)
 
     cache = TvMazeCache()
-    tvdb_client = TvdbClient(api_keys.get("theTVDB"), session) if clean_value(api_keys.get("theTVDB")) else None
+    tvdb_client = TvdbClient(api_keys.get("theTVDB")) if clean_value(api_keys.get("theTVDB")) else None
+    local = threading.local()
+    sessions: List[requests.Session] = []
+
+    def thread_session() -> requests.Session:
+        session = getattr(local, "session", None)
+        if session is None:
+            session = local.session = requests.Session()
+            sessions.append(session)
+        return session
+
+    def lookup_show(title: str, ids: Dict[str, str]) -> Dict[str, object]:
+        session = thread_session()
+        series = lookup_series(title, ids, session, api_keys, cache, tvdb_client)
+        if series["show_id"]:
+            tvmaze_seasons(session, cache, series["show_id"])
+            tvmaze_episodes(session, cache, series["show_id"])
+        return series
+
+    def lookup_movie(data: Dict[str, str]) -> Tuple[Dict[str, str], Dict[str, str]]:
+        return update_movie_metadata(data, thread_session(), api_keys)
+
+    def finish(data: Dict[str, str], future: Optional[Future]) -> Tuple[Dict[str, str], Dict[str, str]]:
+        if future is None:
+            return {}, {}
+        if row_kind(data) == "movie":
+            return future.result()
+        return update_tv_metadata(data, future.result(), thread_session(), cache)
 
     total_updates = 0
-    for row in conn.execute(query):
-        data = dict(zip(aliases, row)) if not isinstance(row, sqlite3.Row) else dict(row)
-        checksum = clean_value(data.get("checksum"))
-        if not checksum:
-            continue
-        torrent_type = clean_value(
-            data.get("import_torrenttype") or data.get("current_torrenttype") or data.get("torrenttype")
-        ).lower()
-        if torrent_type not in {"movie", "tv", "series"}:
-            torrent_type = "tv" if clean_value(data.get("import_series")) else "movie"
-
-        if torrent_type == "movie":
-            updates, id_updates = update_movie_metadata(data, session, api_keys)
-        else:
-            updates, id_updates = update_tv_metadata(data, session, api_keys, cache, tvdb_client)
+    pending = 0
 
+    def write(data: Dict[str, str], updates: Dict[str, str], id_updates: Dict[str, str]) -> None:
+        nonlocal total_updates, pending
+        checksum = clean_value(data.get("checksum"))
         if updates or id_updates:
             update_tables(conn, checksum, updates, id_updates, import_cols)
-            conn.commit()
+            pending += 1
+            if pending >= COMMIT_INTERVAL:
+                conn.commit()
+                pending = 0
             total_updates += len(updates)
             if verbose:
                 changed = ", ".join(sorted(updates)) or ", ".join(sorted(id_updates))
@@ -863,6 +979,37 @@ def process_rows(
             title = clean_value(data.get("import_movie")) or clean_value(data.get("import_series")) or checksum
             print(f"No updates for {title}")
 
+    series_lookups: Dict[tuple, Future] = {}
+    in_flight: Deque[Tuple[Dict[str, str], Optional[Future]]] = deque()
+    try:
+        with ThreadPoolExecutor(max_workers=API_WORKERS) as executor:
+            for row in conn.execute(query):
+                data = dict(zip(aliases, row)) if not isinstance(row, sqlite3.Row) else dict(row)
+                if not clean_value(data.get("checksum")):
+                    continue
+                if row_kind(data) == "movie":
+                    future = executor.submit(lookup_movie, data)
+                else:
+                    title = tv_title(data)
+                    future = None
+                    if title:
+                        ids = gather_ids(data)
+                        key = (title, tuple(ids.values()))
+                        if key not in series_lookups:
+                            series_lookups[key] = executor.submit(lookup_show, title, ids)
+                        future = series_lookups[key]
+                in_flight.append((data, future))
+                if len(in_flight) >= LOOKUP_WINDOW:
+                    data, future = in_flight.popleft()
+                    write(data, *finish(data, future))
+            while in_flight:
+                data, future = in_flight.popleft()
+                write(data, *finish(data, future))
+    finally:
+        for session in sessions:
+            session.close()
+    conn.commit()
+
     if verbose:
         print(f"Total metadata fields updated: {total_updates}")
 
@@ -881,17 +1028,15 @@ def main() -> None:
         print("Error: No API keys configured in user.json")
         return
 
-    if not DB_PATH.exists():
+    try:
+        conn = sqlite3.connect(f"{DB_PATH.resolve().as_uri()}?mode=rw", uri=True)
+    except sqlite3.OperationalError:
         print(f"Error: Database not found at {DB_PATH}")
         return
 
-    with sqlite3.connect(DB_PATH) as conn:
+    with conn:
         conn.row_factory = sqlite3.Row
-        session = requests.Session()
-        try:
-            process_rows(conn, session, api_keys, args.verbose)
-        finally:
-            session.close()
+        process_rows(conn, api_keys, args.verbose)
 
 
 if __name__ == "__main__":
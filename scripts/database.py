@@ -68,6 +68,9 @@ def create_tables(cursor):
 
     cursor.execute(f"CREATE TABLE import ({import_definition})")
     cursor.execute(f"CREATE TABLE online ({online_definition})")
+    cursor.execute(
+        "CREATE INDEX idx_import_pending ON import(newloc) WHERE uploaded IS NULL OR uploaded = 0"
+    )
 
     cursor.execute("PRAGMA table_info(import)")
     import_columns = [row[1] for row in cursor.fetchall()]
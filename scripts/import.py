@@ -3,9 +3,13 @@
 import argparse
 import hashlib
 import json
+import os
 import sqlite3
 import subprocess
 import sys
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import groupby
+from operator import itemgetter
 from pathlib import Path
 
 try:
@@ -15,12 +19,28 @@ except ImportError:
     sys.exit(1)
 
 
+HASH_CHUNK_SIZE = 4 * 1024 * 1024
+PROCESS_POOL_MIN_FILES = 4
+
+
+def _new_sha256():
+    try:
+        return hashlib.sha256(usedforsecurity=False)
+    except TypeError:
+        return hashlib.sha256()
+
+
 def get_checksum(file_path):
     """Generate 256 SHA checksum."""
-    sha256_hash = hashlib.sha256()
-    with open(file_path, "rb") as f:
-        for chunk in iter(lambda: f.read(65536), b""):
-            sha256_hash.update(chunk)
+    if hasattr(hashlib, "file_digest"):
+        with open(file_path, "rb", buffering=0) as f:
+            return hashlib.file_digest(f, _new_sha256).hexdigest()
+    sha256_hash = _new_sha256()
+    buffer = bytearray(HASH_CHUNK_SIZE)
+    view = memoryview(buffer)
+    with open(file_path, "rb", buffering=0) as f:
+        while size := f.readinto(buffer):
+            sha256_hash.update(view[:size])
     return sha256_hash.hexdigest()
 
 
@@ -48,21 +68,36 @@ def extract_filesource(file_path):
     parent_name = path.parent.name
     return parent_name or "unknown"
 
+VIDEO_EXTENSIONS = {
+    ".mkv",
+    ".mp4",
+    ".avi",
+    ".mov",
+    ".wmv",
+    ".flv",
+    ".webm",
+    ".m4v",
+}
+VIDEO_SUFFIXES = tuple(VIDEO_EXTENSIONS)
+
+
 def scan_videos(directory):
     """Find video files."""
-    video_exts = {
-        ".mkv",
-        ".mp4",
-        ".avi",
-        ".mov",
-        ".wmv",
-        ".flv",
-        ".webm",
-        ".m4v",
-    }
-    return sorted(
-        p for p in Path(directory).rglob("*") if p.is_file() and p.suffix.lower() in video_exts
-    )
+    found = []
+    pending = [os.fspath(directory)]
+    while pending:
+        current = pending.pop()
+        try:
+            entries = os.scandir(current)
+        except OSError:
+            continue
+        with entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    pending.append(entry.path)
+                elif entry.name.lower().endswith(VIDEO_SUFFIXES) and entry.is_file():
+                    found.append(entry.path)
+    return sorted(Path(path) for path in found)
 
 
 def _first_or_none(value):
@@ -103,11 +138,8 @@ def extract_media_info(guess):
         "is_movie": False,
     }
 
-def process_single_file(file_path, torrent_site, torrent_type, verbose):
+def process_single_file(file_path, torrent_site, torrent_type):
     """Process one video file into an import table entry."""
-    if verbose:
-        print(f"Processing: {file_path.name}")
-
     checksum = get_checksum(file_path)
     guess = guessit(str(file_path))
     entry = {
@@ -123,14 +155,25 @@ def process_single_file(file_path, torrent_site, torrent_type, verbose):
 
 def process_files(files, torrent_site, torrent_type, verbose):
     """Process video files and extract data per import.md instructions."""
+    if len(files) >= PROCESS_POOL_MIN_FILES:
+        executor_class = ProcessPoolExecutor
+    else:
+        executor_class = ThreadPoolExecutor
     entries = []
-    for file_path in files:
-        try:
-            entries.append(process_single_file(file_path, torrent_site, torrent_type, verbose))
-        except KeyboardInterrupt:
-            raise
-        except Exception as exc:
-            print(f"Error processing {file_path.name}: {exc}")
+    with executor_class(max_workers=os.cpu_count() or 1) as executor:
+        futures = [
+            (file_path, executor.submit(process_single_file, file_path, torrent_site, torrent_type))
+            for file_path in files
+        ]
+        for file_path, future in futures:
+            if verbose:
+                print(f"Processing: {file_path.name}")
+            try:
+                entries.append(future.result())
+            except KeyboardInterrupt:
+                raise
+            except Exception as exc:
+                print(f"Error processing {file_path.name}: {exc}")
     return entries
 
 
@@ -169,33 +212,32 @@ EPISODE_COLUMNS = (
 )
 
 
-def _insert_import(cursor, entry):
-    if entry["is_movie"]:
-        columns = MOVIE_COLUMNS
-    else:
-        columns = EPISODE_COLUMNS
+def _insert_sql(columns):
     placeholders = ", ".join("?" for _ in columns)
     column_list = ", ".join(columns)
-    values = tuple(entry.get(column) for column in columns)
-    cursor.execute(
-        f"INSERT OR REPLACE INTO import ({column_list}) VALUES ({placeholders})",
-        values,
+    assignments = [f"{column} = excluded.{column}" for column in columns if column != "checksum"]
+    assignments += [f"{column} = NULL" for column in MOVIE_COLUMNS + EPISODE_COLUMNS if column not in columns]
+    return (
+        f"INSERT INTO import ({column_list}) VALUES ({placeholders}) "
+        f"ON CONFLICT(checksum) DO UPDATE SET {', '.join(assignments)}"
     )
 
 
+INSERT_SQL = {columns: _insert_sql(columns) for columns in (MOVIE_COLUMNS, EPISODE_COLUMNS)}
+ONLINE_INSERT_SQL = "INSERT INTO online (checksum) VALUES (?) ON CONFLICT(checksum) DO NOTHING"
+
+
 def insert_data(data, verbose):
     """Insert data into import table and copy checksums to online table."""
     db_path = Path(__file__).parent.parent / "tapedeck.db"
     with sqlite3.connect(str(db_path)) as conn:
-        cursor = conn.cursor()
+        for is_movie, entries in groupby(data, key=itemgetter("is_movie")):
+            columns = MOVIE_COLUMNS if is_movie else EPISODE_COLUMNS
+            conn.executemany(INSERT_SQL[columns], map(itemgetter(*columns), entries))
+        conn.executemany(ONLINE_INSERT_SQL, ((entry["checksum"],) for entry in data))
+    if verbose:
         for entry in data:
-            _insert_import(cursor, entry)
-            cursor.execute(
-                "INSERT OR REPLACE INTO online (checksum) VALUES (?)",
-                (entry["checksum"],),
-            )
-            if verbose:
-                print(f"Imported: {entry['filename']}")
+            print(f"Imported: {entry['filename']}")
 
 
 def main():
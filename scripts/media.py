@@ -1,24 +1,58 @@
 #!/usr/bin/env python3
 
 import argparse
+import os
 import re
 import sqlite3
 import subprocess
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
 
+SUBTITLE_EXTENSIONS = ('.srt', '.ass', '.sub', '.vtt')
+MEDIA_WORKERS = os.cpu_count() or 1
+CHANNEL_NAMES = {1: 'mono', 2: 'stereo', 6: '5.1', 8: '7.1'}
+HDR_RE = re.compile(r'hdr|bt2020|pq', re.I)
+RESOLUTION_RE = re.compile(r'(\d+)x(\d+)')
+VIDEO_CODEC_RE = re.compile(r'Video: (\w+)')
+FORMAT_PROFILE_RE = re.compile(r'Format profile\s*:\s*([^\n\r]+)')
+FFMPEG_PROFILE_RE = re.compile(r'Video:.*?(High|Main|Baseline)', re.I)
+VIDEO_BITRATE_RE = re.compile(r'Bit rate[^:]*:\s*([\d\s]+)\s*kb/s')
+AUDIO_CODEC_RE = re.compile(r'Audio: (\w+)')
+KBPS_RE = re.compile(r'(\d+)\s*kb/s')
+CHANNELS_RE = re.compile(r'(\d+)\s*channels?', re.I)
+SAMPLE_RATE_RE = re.compile(r'(\d+)\s*Hz')
+FILESIZE_RE = re.compile(r'(\d+(?:\.\d+)?)\s*[MG]iB')
+SIZE_KB_RE = re.compile(r'size=\s*(\d+)kB')
+DURATION_RE = re.compile(r'Duration: (\d+):(\d+):(\d+)')
+AUDIO_LANG_RE = re.compile(r'Stream.*\(([a-z]{2,3})\).*Audio', re.I)
+SUBTITLE_LANG_RE = re.compile(r'Stream.*\(([a-z]{2,3})\).*Subtitle', re.I)
+LANGUAGE_RE = re.compile(r'Language\s*:\s*([a-zA-Z]+)')
+DESCRIPTION_RE = re.compile(r'DESCRIPTION\s*:\s*(.+)')
+
+
+@lru_cache(maxsize=1024)
+def subtitle_stems(directory):
+    """Stems of external subtitle files in one folder, read once per folder."""
+    try:
+        with os.scandir(directory) as entries:
+            return frozenset(os.path.splitext(e.name)[0] for e in entries
+                             if e.name.lower().endswith(SUBTITLE_EXTENSIONS))
+    except OSError:
+        return frozenset()
+
 
-def get_data(file_path, verbose):
+def get_data(file_path):
     """Get ffmpeg and mediainfo output."""
-    if verbose: print(f"  Running ffmpeg...")
     try:
         ffmpeg = subprocess.run(["ffmpeg", "-i", str(file_path), "-hide_banner"],
                               capture_output=True, text=True, timeout=30).stderr
     except:
         ffmpeg = ""
 
-    if verbose: print(f"  Running mediainfo...")
     try:
-        mediainfo = subprocess.run(["mediainfo", str(file_path)],
+        mediainfo = subprocess.run(["mediainfo", "--ParseSpeed=0", str(file_path)],
                                  capture_output=True, text=True, timeout=30).stdout
     except:
         mediainfo = ""
@@ -26,27 +60,27 @@ def get_data(file_path, verbose):
     return ffmpeg, mediainfo
 
 
-def extract(file_path, ffmpeg, mediainfo):
+def extract(file_path, ffmpeg, mediainfo, size):
     """Extract all data per exact instructions."""
     d = {}
 
     # Resolution from ffmpeg
-    if m := re.search(r'(\d+)x(\d+)', ffmpeg):
+    if m := RESOLUTION_RE.search(ffmpeg):
         h = int(m.group(2))
         d['resolution'] = ('2160p' if h >= 2160 else '1080p' if h >= 1080 else
                           '720p' if h >= 720 else '576p' if h >= 576 else
                           '480p' if h >= 480 else 'sd')
 
     # HDR from ffmpeg
-    d['hdr'] = 'HDR' if any(x in ffmpeg.lower() for x in ['hdr', 'bt2020', 'pq']) else 'SDR'
+    d['hdr'] = 'HDR' if HDR_RE.search(ffmpeg) else 'SDR'
 
     # Video codec from ffmpeg
-    if m := re.search(r'Video: (\w+)', ffmpeg):
+    if m := VIDEO_CODEC_RE.search(ffmpeg):
         codec = m.group(1).lower()
         d['vcodec'] = 'h265' if codec == 'hevc' else 'h264' if 'x264' in codec else codec
 
     # Advanced video codec - mediainfo first, ffmpeg backup per instructions
-    if m := re.search(r'Format profile\s*:\s*([^\n\r]+)', mediainfo):
+    if m := FORMAT_PROFILE_RE.search(mediainfo):
         profile = m.group(1).strip()
         if '@L' in profile:
             parts = profile.split('@L')
@@ -55,7 +89,7 @@ def extract(file_path, ffmpeg, mediainfo):
                 d['vacodec'] = f"AVC {parts[0].upper()} L{level}"
         else:
             d['vacodec'] = f"AVC {profile.upper()}"
-    elif m := re.search(r'Video:.*?(High|Main|Baseline)', ffmpeg, re.I):
+    elif m := FFMPEG_PROFILE_RE.search(ffmpeg):
         d['vacodec'] = f"AVC {m.group(1).upper()}"
 
     # Video bitrate from mediainfo - use "Mpbs" format per instructions (includes typo)
@@ -65,19 +99,19 @@ def extract(file_path, ffmpeg, mediainfo):
         if line.strip() == 'Video': in_video = True
         elif line.strip() in ['Audio', 'Text', 'General']: in_video = False
         elif in_video and 'Bit rate' in line and 'mode' not in line.lower():
-            if m := re.search(r'Bit rate[^:]*:\s*([\d\s]+)\s*kb/s', line):
+            if m := VIDEO_BITRATE_RE.search(line):
                 kbps = int(m.group(1).replace(' ', ''))
                 d['vbitrate'] = f"{kbps/1000:.2f} Mpbs"  # Note: "Mpbs" per instructions
                 break
 
     # Audio codec from ffmpeg
-    if m := re.search(r'Audio: (\w+)', ffmpeg):
+    if m := AUDIO_CODEC_RE.search(ffmpeg):
         codec = m.group(1).lower()
         d['acodec'] = 'ac3' if codec == 'ac-3' else 'eac3' if codec == 'e-ac-3' else codec
 
     # Audio bitrate from ffmpeg
     for line in ffmpeg.split('\n'):
-        if 'Audio:' in line and (m := re.search(r'(\d+)\s*kb/s', line)):
+        if 'Audio:' in line and (m := KBPS_RE.search(line)):
             d['abitrate'] = f"{m.group(1)} kbps"
             break
 
@@ -88,48 +122,50 @@ def extract(file_path, ffmpeg, mediainfo):
             elif 'stereo' in line.lower(): d['achannels'] = 'stereo'
             elif '5.1' in line: d['achannels'] = '5.1'
             elif '7.1' in line: d['achannels'] = '7.1'
-            elif m := re.search(r'(\d+)\s*channels?', line, re.I):
+            elif m := CHANNELS_RE.search(line):
                 ch = int(m.group(1))
-                d['achannels'] = {1:'mono', 2:'stereo', 6:'5.1', 8:'7.1'}.get(ch, f"{ch} channels")
+                d['achannels'] = CHANNEL_NAMES.get(ch) or f"{ch} channels"
             break
 
     # Audio sample rate from ffmpeg
-    if m := re.search(r'(\d+)\s*Hz', ffmpeg):
+    if m := SAMPLE_RATE_RE.search(ffmpeg):
         d['asample'] = f"{int(m.group(1))/1000:g} kHz"
 
     # File size from ffmpeg per instructions (not file system!)
     # ffmpeg -i shows file info but not always size - try different patterns
-    if m := re.search(r'(\d+(?:\.\d+)?)\s*[MG]iB', ffmpeg):
+    if m := FILESIZE_RE.search(ffmpeg):
         if 'GiB' in m.group(): d['filesize'] = f"{float(m.group(1)) * 1024:.0f} MB"
         else: d['filesize'] = f"{float(m.group(1)):.0f} MB"
-    elif m := re.search(r'size=\s*(\d+)kB', ffmpeg):
+    elif m := SIZE_KB_RE.search(ffmpeg):
         d['filesize'] = f"{int(m.group(1))/1024:.0f} MB"
     else:
         # Fallback to file system since ffmpeg -i doesn't always show size
-        try:
-            size_mb = Path(file_path).stat().st_size / (1024 * 1024)
-            d['filesize'] = f"{size_mb:.0f} MB"
-        except: pass
+        d['filesize'] = f"{size / (1024 * 1024):.0f} MB"
 
     # Duration from ffmpeg
-    if m := re.search(r'Duration: (\d+):(\d+):(\d+)', ffmpeg):
-        total_min = int(m.group(1)) * 60 + int(m.group(2))
-        if int(m.group(3)) >= 30: total_min += 1
-        d['duration'] = f"{total_min} minutes"
+    if m := DURATION_RE.search(ffmpeg):
+        seconds = int(m.group(1)) * 3600 + int(m.group(2)) * 60 + int(m.group(3))
+        d['duration'] = f"{(seconds + 30) // 60} minutes"
+        # ParseSpeed=0 skips the stream scan, so untagged files use size/duration minus the audio streams
+        if 'vbitrate' not in d and seconds:
+            audio_kbps = sum(int(m.group(1)) for line in ffmpeg.split('\n')
+                             if 'Audio:' in line and (m := KBPS_RE.search(line)))
+            kbps = size * 8 / seconds / 1000 - audio_kbps
+            if kbps > 0: d['vbitrate'] = f"{kbps/1000:.2f} Mpbs"
 
     # Language - per instructions: audio channel language, falls back on subtitles, falls back English (ffmpeg) (mediainfo)
     lang = None
     # Check audio language from ffmpeg
-    if m := re.search(r'Stream.*\(([a-z]{2,3})\).*Audio', ffmpeg, re.I):
+    if m := AUDIO_LANG_RE.search(ffmpeg):
         if m.group(1).lower() != 'und':
             lang = m.group(1).lower()
     # Fallback: subtitles language from ffmpeg
     if not lang:
-        if m := re.search(r'Stream.*\(([a-z]{2,3})\).*Subtitle', ffmpeg, re.I):
+        if m := SUBTITLE_LANG_RE.search(ffmpeg):
             if m.group(1).lower() != 'und':
                 lang = m.group(1).lower()
     # Fallback: mediainfo
-    if not lang and (m := re.search(r'Language\s*:\s*([a-zA-Z]+)', mediainfo)):
+    if not lang and (m := LANGUAGE_RE.search(mediainfo)):
         lang_name = m.group(1).lower()
         if lang_name == 'english': lang = 'eng'
         elif lang_name not in ['und', 'undefined']: lang = lang_name[:3]
@@ -137,8 +173,8 @@ def extract(file_path, ffmpeg, mediainfo):
 
     # Subtitles - internal, external, both
     has_internal = 'Subtitle:' in ffmpeg
-    has_external = any(Path(file_path).with_suffix(ext).exists()
-                      for ext in ['.srt', '.ass', '.sub', '.vtt'])
+    path = Path(file_path)
+    has_external = path.stem in subtitle_stems(str(path.parent))
     if has_internal and has_external: d['subtitles'] = 'both'
     elif has_internal: d['subtitles'] = 'internal'
     elif has_external: d['subtitles'] = 'external'
@@ -148,15 +184,28 @@ def extract(file_path, ffmpeg, mediainfo):
 
 def get_desc(ffmpeg):
     """Get episode/movie descriptions from ffmpeg per instructions."""
-    if m := re.search(r'DESCRIPTION\s*:\s*(.+)', ffmpeg):
+    if m := DESCRIPTION_RE.search(ffmpeg):
         desc = m.group(1).strip()
         if len(desc) > 10: return desc
     return None
 
 
+def analyze(file_path):
+    """Probe one file in a worker thread; returns (status, import data, description)."""
+    try:
+        size = os.stat(file_path).st_size
+    except OSError:
+        return 'missing', None, None
+    ffmpeg, mediainfo = get_data(file_path)
+    if not ffmpeg:
+        return 'failed', None, None
+    return 'ok', extract(file_path, ffmpeg, mediainfo, size), get_desc(ffmpeg)
+
+
 def main():
     parser = argparse.ArgumentParser(description="Media analysis")
     parser.add_argument("-v", "--verbose", action="store_true")
+    parser.add_argument("-f", "--force", action="store_true", help="Re-probe files that already have media data")
     args = parser.parse_args()
 
     db_path = Path(__file__).parent.parent / "tapedeck.db"
@@ -174,46 +223,56 @@ def main():
     if has_movie: select_cols.append("movie")
     if has_series: select_cols.append("series")
 
-    cursor.execute(f"SELECT {', '.join(select_cols)} FROM import WHERE fileloc IS NOT NULL")
+    # hdr is always written once a file has been probed, so it marks finished rows
+    pending = "" if args.force or 'hdr' not in cols_info else " AND hdr IS NULL"
+    cursor.execute(f"SELECT {', '.join(select_cols)} FROM import WHERE fileloc IS NOT NULL{pending}")
     files = cursor.fetchall()
 
     processed = 0
-    for row in files:
-        checksum = row[0]
-        file_path = row[1]
-        movie = row[2] if has_movie and len(row) > 2 else None
-        series = row[3] if has_series and len(row) > 3 else (row[2] if has_series and not has_movie else None)
-
-        if args.verbose: print(f"Processing: {Path(file_path).name}")
-
-        if not Path(file_path).exists():
-            if args.verbose: print("  File not found")
-            continue
-
-        ffmpeg, mediainfo = get_data(file_path, args.verbose)
-        if not ffmpeg:
-            if args.verbose: print("  FFmpeg failed")
-            continue
-
-        # Extract import table data
-        data = extract(file_path, ffmpeg, mediainfo)
-        if data:
-            cols = ', '.join(f"{k} = ?" for k in data.keys())
-            cursor.execute(f"UPDATE import SET {cols} WHERE checksum = ?",
-                          list(data.values()) + [checksum])
-            if args.verbose: print(f"  Updated {len(data)} fields")
-
-        # Extract online table descriptions per instructions - from ffmpeg
-        desc = get_desc(ffmpeg)
-        if desc:
-            if movie:
-                cursor.execute("UPDATE online SET dmovie = ? WHERE checksum = ?", (desc, checksum))
-            elif series:
-                cursor.execute("UPDATE online SET depisode = ? WHERE checksum = ?", (desc, checksum))
-            if args.verbose: print("  Added description")
-
-        processed += 1
-
+    import_updates = defaultdict(list)
+    online_updates = defaultdict(list)
+    with ThreadPoolExecutor(max_workers=MEDIA_WORKERS) as pool:
+        results = pool.map(analyze, [row[1] for row in files])
+        try:
+            for row, (status, data, desc) in zip(files, results):
+                checksum = row[0]
+                file_path = row[1]
+                movie = row[2] if has_movie and len(row) > 2 else None
+                series = row[3] if has_series and len(row) > 3 else (row[2] if has_series and not has_movie else None)
+
+                if args.verbose: print(f"Processing: {Path(file_path).name}")
+
+                if status == 'missing':
+                    if args.verbose: print("  File not found")
+                    continue
+
+                if status == 'failed':
+                    if args.verbose: print("  FFmpeg failed")
+                    continue
+
+                # Extract import table data
+                if data:
+                    import_updates[tuple(data)].append((*data.values(), checksum))
+                    if args.verbose: print(f"  Updated {len(data)} fields")
+
+                # Extract online table descriptions per instructions - from ffmpeg
+                if desc:
+                    if movie:
+                        online_updates['dmovie'].append((desc, checksum))
+                    elif series:
+                        online_updates['depisode'].append((desc, checksum))
+                    if args.verbose: print("  Added description")
+
+                processed += 1
+        finally:
+            # Cancels probes still queued if the loop is interrupted
+            results.close()
+
+    for keys, rows in import_updates.items():
+        cols = ', '.join(f"{k} = ?" for k in keys)
+        cursor.executemany(f"UPDATE import SET {cols} WHERE checksum = ?", rows)
+    for col, rows in online_updates.items():
+        cursor.executemany(f"UPDATE online SET {col} = ? WHERE checksum = ?", rows)
     conn.commit()
     conn.close()
     print(f"Processed {processed} files")
@@ -13,6 +13,23 @@ from difflib import SequenceMatcher
 MIN_HTML_LENGTH = 100_000
 AMAZON_URL_PATTERN = re.compile(r"https://www\\.amazon\\.com/gp/video/detail/([A-Z0-9]+)/", re.IGNORECASE)
 LOG_FILENAMES = ("StreamFab.log", "streamfab.log")
+TITLE_STRIP_TABLE = str.maketrans('', '', ' -_')
+EPISODE_NUMBER_PATTERNS = tuple(re.compile(pattern, re.IGNORECASE) for pattern in (
+    r'S\d+\s*E(\d+)',  # S1 E5, S01E05
+    r'Episode\s*(\d+)',  # Episode 5
+    r'Ep\s*(\d+)',  # Ep 5
+    r'^(\d+)\.',  # 5. Title
+    r'E(\d+)\s*-',  # E5 - Title
+    r'^\s*(\d+)\s*$',  # Just a number
+))
+EPISODE_FALLBACK_PATTERN = re.compile(r'E(\d+)')
+EPISODE_PREFIX_PATTERNS = tuple(re.compile(pattern, re.IGNORECASE) for pattern in (
+    r'^S\d+\s*E\d+\s*[-–—]\s*',  # S1 E5 - Title
+    r'^Episode\s*\d+\s*[-–—]\s*',  # Episode 5 - Title
+    r'^Ep\s*\d+\s*[-–—]\s*',  # Ep 5 - Title
+    r'^\d+\.\s*',  # 5. Title
+    r'^E\d+\s*[-–—]\s*',  # E5 - Title
+))
 
 def check_playwright():
     try:
@@ -65,20 +82,20 @@ def get_urls(log_path):
     return urls[::-1]
 
 
-def get_content():
+def open_database():
     db_path = Path(__file__).parent.parent / "tapedeck.db"
     if not db_path.exists():
         print(f"Database not found: {db_path}")
         sys.exit(1)
+    return sqlite3.connect(str(db_path))
 
-    conn = sqlite3.connect(str(db_path))
+def get_content(conn):
     cursor = conn.cursor()
 
     cursor.execute("PRAGMA table_info(import)")
     cols = {row[1] for row in cursor.fetchall()}
 
     if 'checksum' not in cols:
-        conn.close()
         print("Import table missing required checksum column")
         sys.exit(1)
 
@@ -88,17 +105,14 @@ def get_content():
     if {'series', 'season', 'episode'}.issubset(cols):
         select_title = f", {title_column}" if title_column else ", ''"
         cursor.execute(
-            "SELECT checksum, series, season, episode" + select_title +
+            "SELECT checksum, series, CAST(season AS INTEGER) AS season_num,"
+            " CAST(episode AS INTEGER) AS episode_num" + select_title +
             " FROM import WHERE dlsource = 'Amazon' AND series IS NOT NULL AND TRIM(series) != ''"
-            " AND season IS NOT NULL ORDER BY series, CAST(season AS INTEGER), CAST(episode AS INTEGER)"
+            " AND season IS NOT NULL ORDER BY series, season_num, episode_num"
         )
-        for checksum, series, season, episode, title in cursor.fetchall():
-            try:
-                season_num = int(season)
-            except (TypeError, ValueError):
-                continue
+        for checksum, series, season_num, episode_num, title in cursor:
             tv_items[(series, season_num)].append(
-                (checksum, series, season_num, episode, title or '')
+                (checksum, series, season_num, episode_num, title or '')
             )
 
     movie_items = defaultdict(list)
@@ -106,10 +120,9 @@ def get_content():
         cursor.execute(
             "SELECT checksum, movie FROM import WHERE dlsource = 'Amazon' AND movie IS NOT NULL AND TRIM(movie) != ''"
         )
-        for checksum, movie in cursor.fetchall():
+        for checksum, movie in cursor:
             movie_items[movie].append((checksum, movie))
 
-    conn.close()
     return dict(tv_items), dict(movie_items)
 
 def similarity_score(a, b):
@@ -120,7 +133,7 @@ def similarity_score(a, b):
 def normalize_title(title):
     if not title:
         return ""
-    return title.lower().replace(' ', '').replace('-', '').replace('_', '')
+    return title.casefold().translate(TITLE_STRIP_TABLE)
 
 def titles_match(title1, title2, threshold=0.8):
     if not title1 or not title2:
@@ -152,23 +165,16 @@ def titles_match(title1, title2, threshold=0.8):
 def extract_episode_number(text):
     if not text:
         return None
-    patterns = [
-        r'S\d+\s*E(\d+)',  # S1 E5, S01E05
-        r'Episode\s*(\d+)',  # Episode 5
-        r'Ep\s*(\d+)',  # Ep 5
-        r'^(\d+)\.',  # 5. Title
-        r'E(\d+)\s*-',  # E5 - Title
-        r'^\s*(\d+)\s*$',  # Just a number
-    ]
-
-    for pattern in patterns:
-        match = re.search(pattern, str(text), re.IGNORECASE)
+    if isinstance(text, int):
+        return text
+    for pattern in EPISODE_NUMBER_PATTERNS:
+        match = pattern.search(str(text))
         if match:
             return int(match.group(1))
 
     # Handle "E1" format from database
     if str(text).startswith('E'):
-        num_match = re.search(r'E(\d+)', str(text))
+        num_match = EPISODE_FALLBACK_PATTERN.search(str(text))
         if num_match:
             return int(num_match.group(1))
 
@@ -178,18 +184,9 @@ def clean_episode_title(title):
     if not title:
         return ''
 
-    # Remove common episode prefixes
-    patterns = [
-        r'^S\d+\s*E\d+\s*[-–—]\s*',  # S1 E5 - Title
-        r'^Episode\s*\d+\s*[-–—]\s*',  # Episode 5 - Title
-        r'^Ep\s*\d+\s*[-–—]\s*',  # Ep 5 - Title
-        r'^\d+\.\s*',  # 5. Title
-        r'^E\d+\s*[-–—]\s*',  # E5 - Title
-    ]
-
     cleaned = title.strip()
-    for pattern in patterns:
-        cleaned = re.sub(pattern, '', cleaned, flags=re.IGNORECASE).strip()
+    for pattern in EPISODE_PREFIX_PATTERNS:
+        cleaned = pattern.sub('', cleaned).strip()
 
     return cleaned
 
@@ -781,13 +778,11 @@ def update_movie_data(cursor, match, scraped_data, cols):
         values.append(match['checksum'])
         cursor.execute(f"UPDATE online SET {', '.join(updates)} WHERE checksum = ?", values)
 
-def update_database(matches, scraped_data):
-    db_path = Path(__file__).parent.parent / "tapedeck.db"
-    conn = sqlite3.connect(str(db_path))
-    cursor = conn.cursor()
+def get_online_columns(conn):
+    return {row[1] for row in conn.execute("PRAGMA table_info(online)")}
 
-    cursor.execute("PRAGMA table_info(online)")
-    cols = {row[1] for row in cursor.fetchall()}
+def update_database(conn, cols, matches, scraped_data):
+    cursor = conn.cursor()
 
     for match in matches:
         if 'series' in match:
@@ -815,7 +810,6 @@ def update_database(matches, scraped_data):
                       (scraped_data['url'], match['checksum']))
 
     conn.commit()
-    conn.close()
 
 async def process_url(url, tv_map, movie_map, tv_needed, movie_needed, verbose):
     if verbose:
@@ -881,9 +875,17 @@ async def main():
     parser.add_argument("-v", "--verbose", action="store_true")
     args = parser.parse_args()
 
+    conn = open_database()
+    try:
+        await run(conn, args)
+    finally:
+        conn.close()
+
+async def run(conn, args):
     log_location = get_config()
     urls = get_urls(log_location)
-    tv_map, movie_map = get_content()
+    tv_map, movie_map = get_content(conn)
+    online_cols = get_online_columns(conn)
 
     if not urls:
         print("No URLs found in log")
@@ -928,10 +930,10 @@ async def main():
                 if not validate_episodes(matches, scraped):
                     print("Process stopped due to missing episodes")
                     return
-                update_database(matches, scraped)
+                update_database(conn, online_cols, matches, scraped)
                 tv_needed.discard(key)
             else:
-                update_database(matches, scraped)
+                update_database(conn, online_cols, matches, scraped)
                 movie_needed.discard(key)
 
             any_updates = True
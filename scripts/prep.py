@@ -6,10 +6,14 @@ from __future__ import annotations
 import argparse
 import json
 import os
+import re
 import shutil
 import sqlite3
+import threading
 from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
 from typing import Dict, Iterable, List, Optional, Sequence, Tuple
 
@@ -17,6 +21,10 @@ CONFIG_PATH = Path(__file__).parent.parent / "user.json"
 PREFERENCES_DIR = Path(__file__).parent.parent / "preferences"
 SOURCES_PATH = PREFERENCES_DIR / "sources.json"
 DB_PATH = Path(__file__).parent.parent / "tapedeck.db"
+PREP_WORKERS = 4
+SANITIZE_RE = re.compile(r"(?:[^\w&'-]|_)+")
+
+_job_output = threading.local()
 
 TEMPLATE_FILENAMES = {
     "series": "series.json",
@@ -57,6 +65,7 @@ AUDIO_CODEC_ORDER = {
 
 CHANNEL_ORDER = {"7.1": 3, "5.1": 2, "STEREO": 1, "MONO": 0}
 SUBTITLE_EXTENSIONS = {".srt", ".ass", ".vtt", ".sub"}
+SUBTITLE_SUFFIXES = tuple(SUBTITLE_EXTENSIONS)
 
 LANGUAGE_MAP = {
     "en": "English",
@@ -359,6 +368,10 @@ def load_config() -> Dict:
         missing = ", ".join(sorted(required_default - set(default)))
         raise SystemExit(f"Error: Missing default keys in user.json: {missing}")
 
+    workers = default.get("prepworkers", PREP_WORKERS)
+    if isinstance(workers, bool) or not isinstance(workers, int) or workers < 1:
+        raise SystemExit("Error: user.json default.prepworkers must be a positive integer")
+
     file_upload = (locations.get("file_upload") or {}).keys()
     fileflows = (locations.get("fileflows") or {}).keys()
     for key in ("movies", "tv_shows"):
@@ -395,14 +408,7 @@ def load_template(name: str) -> List[str]:
 def sanitize_piece(text: Optional[str]) -> str:
     if not text:
         return "Unknown"
-    cleaned = "".join(
-        ch if ch.isalnum() or ch in {".", "-", "&", "'"} else " " for ch in text
-    )
-    collapsed = " ".join(cleaned.split())
-    slug = collapsed.replace(" ", ".")
-    while ".." in slug:
-        slug = slug.replace("..", ".")
-    return slug.strip(".") or "Unknown"
+    return SANITIZE_RE.sub(".", text).strip(".") or "Unknown"
 
 
 def normalize_resolution(value: Optional[str]) -> str:
@@ -1183,12 +1189,25 @@ def build_movie_base_name(
     base = ".".join(filter(None, parts))
     return f"{base}-{release_tag}"
 
+def log(message: str) -> None:
+    lines = getattr(_job_output, "lines", None)
+    if lines is None:
+        print(message)
+    else:
+        lines.append(message)
+
+
+def release_key(name: str) -> str:
+    # Every release folder starts with this piece, so jobs that could share a folder share a key.
+    return sanitize_piece(name).split(".", 1)[0].casefold()
+
+
 def ensure_directory(path: Path, verbose: bool = False) -> bool:
     try:
         path.mkdir(parents=True, exist_ok=True)
         return True
     except OSError as exc:
-        print(f"Error: Could not create directory {path}: {exc}")
+        log(f"Error: Could not create directory {path}: {exc}")
         return False
 
 
@@ -1198,16 +1217,31 @@ def link_or_copy(src: Path, dest: Path, verbose: bool = False) -> bool:
     try:
         os.link(src, dest)
         return True
+    except FileExistsError:
+        return True
     except OSError:
         try:
             shutil.copy2(src, dest)
             return True
         except OSError as exc:
             if verbose:
-                print(f"Error: Failed to copy {src} to {dest}: {exc}")
+                log(f"Error: Failed to copy {src} to {dest}: {exc}")
             return False
 
 
+@lru_cache(maxsize=1024)
+def subtitle_names(directory: str) -> Tuple[str, ...]:
+    try:
+        with os.scandir(directory) as entries:
+            return tuple(
+                entry.name
+                for entry in entries
+                if entry.name.lower().endswith(SUBTITLE_SUFFIXES) and entry.is_file()
+            )
+    except OSError:
+        return ()
+
+
 def copy_subtitles(
     video_path: Path,
     base_name: str,
@@ -1217,10 +1251,12 @@ def copy_subtitles(
     if not video_path.exists():
         return
     stem = video_path.stem
-    for sub_file in video_path.parent.glob(f"{stem}.*"):
-        if sub_file.suffix.lower() not in SUBTITLE_EXTENSIONS:
+    prefix = f"{stem}."
+    for sub_name in subtitle_names(str(video_path.parent)):
+        if not sub_name.startswith(prefix):
             continue
-        suffix_part = sub_file.name[len(stem) :]
+        sub_file = video_path.parent / sub_name
+        suffix_part = sub_name[len(stem) :]
         new_name = f"{base_name}{suffix_part}"
         for dest_dir in destinations:
             if ensure_directory(dest_dir, verbose):
@@ -1239,7 +1275,7 @@ def write_nfo(content: str, destinations: Sequence[Path], filename: str, verbose
             (dest_dir / filename).write_text(content, encoding="utf-8")
         except OSError as exc:
             if verbose:
-                print(f"Error: Failed to write NFO {dest_dir / filename}: {exc}")
+                log(f"Error: Failed to write NFO {dest_dir / filename}: {exc}")
 
 
 def process_movie(
@@ -1255,12 +1291,12 @@ def process_movie(
     fileloc = record.get("fileloc")
     if not fileloc:
         if verbose:
-            print("Skipping movie with missing file location")
+            log("Skipping movie with missing file location")
         return 0
     src_path = Path(fileloc)
     if not src_path.exists():
         if verbose:
-            print(f"Skipping missing file: {src_path}")
+            log(f"Skipping missing file: {src_path}")
         return 0
 
     metadata = aggregate_metadata([record])
@@ -1293,7 +1329,7 @@ def process_movie(
 
     updates.append((str(upload_path), filename, record["checksum"]))
     if verbose:
-        print(f"Processed movie: {base_name}")
+        log(f"Processed movie: {base_name}")
     return 1
 
 
@@ -1310,12 +1346,12 @@ def process_episode(
     fileloc = record.get("fileloc")
     if not fileloc:
         if verbose:
-            print("Skipping episode with missing file location")
+            log("Skipping episode with missing file location")
         return 0
     src_path = Path(fileloc)
     if not src_path.exists():
         if verbose:
-            print(f"Skipping missing file: {src_path}")
+            log(f"Skipping missing file: {src_path}")
         return 0
 
     metadata = aggregate_metadata([record])
@@ -1348,7 +1384,7 @@ def process_episode(
 
     updates.append((str(upload_path), filename, record["checksum"]))
     if verbose:
-        print(f"Processed episode: {base_name}")
+        log(f"Processed episode: {base_name}")
     return 1
 
 
@@ -1367,7 +1403,7 @@ def process_season_group(
     existing_records = [record for record in records if record.get("fileloc") and Path(record["fileloc"]).exists()]
     if not existing_records:
         if verbose:
-            print(f"No files found for season {series_name} S{int(season):02d}")
+            log(f"No files found for season {series_name} S{int(season):02d}")
         return 0
 
     metadata = aggregate_metadata(existing_records)
@@ -1408,7 +1444,7 @@ def process_season_group(
         processed += 1
 
     if processed and verbose:
-        print(f"Processed season: {folder_name} ({processed} files)")
+        log(f"Processed season: {folder_name} ({processed} files)")
     return processed
 
 
@@ -1426,7 +1462,7 @@ def process_series_group(
     existing_records = [record for record in records if record.get("fileloc") and Path(record["fileloc"]).exists()]
     if not existing_records:
         if verbose:
-            print(f"No files found for series {series_name}")
+            log(f"No files found for series {series_name}")
         return 0
 
     metadata = aggregate_metadata(existing_records)
@@ -1481,7 +1517,7 @@ def process_series_group(
             processed += 1
 
     if processed and verbose:
-        print(f"Processed series: {series_folder} ({processed} files)")
+        log(f"Processed series: {series_folder} ({processed} files)")
     return processed
 
 def to_int(value: Optional[object]) -> Optional[int]:
@@ -1495,12 +1531,10 @@ def to_int(value: Optional[object]) -> Optional[int]:
 
 def fetch_records(conn: sqlite3.Connection, default_type: str) -> List[Dict]:
     conn.row_factory = sqlite3.Row
-    import_rows = conn.execute("SELECT * FROM import").fetchall()
-    online_rows = conn.execute("SELECT * FROM online").fetchall()
-    online_map = {row["checksum"]: dict(row) for row in online_rows}
+    online_map = {row["checksum"]: dict(row) for row in conn.execute("SELECT * FROM online")}
 
     records: List[Dict] = []
-    for row in import_rows:
+    for row in conn.execute("SELECT * FROM import"):
         record = dict(row)
         record["season"] = to_int(record.get("season"))
         record["episode"] = to_int(record.get("episode"))
@@ -1510,6 +1544,20 @@ def fetch_records(conn: sqlite3.Connection, default_type: str) -> List[Dict]:
         records.append(record)
     return records
 
+def run_jobs(
+    jobs: Sequence[Tuple], updates: List[Tuple[str, str, str]], verbose: bool
+) -> List[Tuple[int, List[str]]]:
+    results = []
+    for function, *job_args in jobs:
+        lines: List[str] = []
+        _job_output.lines = lines
+        try:
+            results.append((function(*job_args, updates, verbose), lines))
+        finally:
+            _job_output.lines = None
+    return results
+
+
 def process_all_records(
     records: Sequence[Dict],
     config: Dict,
@@ -1549,20 +1597,29 @@ def process_all_records(
             season_value = record.get("season") or 0
             season_groups[(series_name, int(season_value))].append(record)
 
+    chains: Dict[str, List[Tuple]] = defaultdict(list)
+    order: List[Tuple[str, int]] = []
+
+    def add_job(name: str, *job: object) -> None:
+        key = release_key(name)
+        order.append((key, len(chains[key])))
+        chains[key].append(job)
+
     for record in movies:
-        processed += process_movie(
+        add_job(
+            record.get("movie") or "Movie",
+            process_movie,
             record,
             config,
             sources,
             templates,
             upload_movies,
             fileflows_movies,
-            updates,
-            verbose,
         )
-
     for series_name, series_records in series_groups.items():
-        processed += process_series_group(
+        add_job(
+            series_name,
+            process_series_group,
             series_name,
             series_records,
             config,
@@ -1570,12 +1627,11 @@ def process_all_records(
             templates,
             upload_tv,
             fileflows_tv,
-            updates,
-            verbose,
         )
-
     for (series_name, season), group_records in season_groups.items():
-        processed += process_season_group(
+        add_job(
+            series_name,
+            process_season_group,
             series_name,
             season,
             group_records,
@@ -1584,22 +1640,29 @@ def process_all_records(
             templates,
             upload_tv,
             fileflows_tv,
-            updates,
-            verbose,
         )
-
     for record in episodes:
-        processed += process_episode(
+        add_job(
+            record.get("series") or "Episode",
+            process_episode,
             record,
             config,
             sources,
             templates,
             upload_tv,
             fileflows_tv,
-            updates,
-            verbose,
         )
 
+    # Jobs that can write to the same folder run one after another in a single worker.
+    workers = config["default"].get("prepworkers", PREP_WORKERS)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {key: executor.submit(run_jobs, jobs, updates, verbose) for key, jobs in chains.items()}
+        for key, index in order:
+            count, lines = futures[key].result()[index]
+            processed += count
+            for line in lines:
+                print(line)
+
     return updates, processed
 
 def load_templates_map() -> Dict[str, List[str]]:
@@ -83,10 +83,9 @@ def collect_releases(conn: sqlite3.Connection, config: Dict, verbose: bool) -> L
           AND TRIM(i.newloc) != ''
           AND (i.uploaded IS NULL OR i.uploaded = 0)
     """
-    rows = conn.execute(query).fetchall()
     releases: Dict[Path, Dict] = {}
 
-    for checksum, newloc, torrenttype, torrentsite, imdb, tvmaze in rows:
+    for checksum, newloc, torrenttype, torrentsite, imdb, tvmaze in conn.execute(query):
         release_path = Path(newloc)
         if not release_path.exists():
             if verbose:
@@ -175,7 +174,14 @@ def create_torrent(source: Path, announce_url: str, output_path: Path, verbose:
     return True
 
 
-def upload_torrent(release: Dict, torrent_path: Path, payload: Dict[str, str], site_prefs: Dict, verbose: bool) -> bool:
+def upload_torrent(
+    session: requests.Session,
+    release: Dict,
+    torrent_path: Path,
+    payload: Dict[str, str],
+    site_prefs: Dict,
+    verbose: bool,
+) -> bool:
     upload_url = site_prefs.get("upload_url")
     if not upload_url:
         print("Error: upload_url missing in torrentsites.json")
@@ -191,7 +197,7 @@ def upload_torrent(release: Dict, torrent_path: Path, payload: Dict[str, str], s
         payload["description"] = f"Release: {release['directory'].name}\nGenerated by upload.py"
 
     try:
-        response = requests.post(upload_url, data=payload, files=files, timeout=60)
+        response = session.post(upload_url, data=payload, files=files, timeout=60)
     except requests.RequestException as exc:
         print(f"Error: Upload failed for {release['directory'].name}: {exc}")
         return False
@@ -242,7 +248,7 @@ def main() -> None:
         print(f"Error: Database not found at {DB_PATH}")
         return
 
-    with sqlite3.connect(DB_PATH) as conn:
+    with sqlite3.connect(DB_PATH) as conn, requests.Session() as session:
         conn.row_factory = sqlite3.Row
         releases = collect_releases(conn, config, args.verbose)
 
@@ -301,7 +307,7 @@ def main() -> None:
                 continue
 
             payload = build_payload(release, announce_key, mapping, category_map)
-            if not upload_torrent(release, temp_torrent, payload, prefs, args.verbose):
+            if not upload_torrent(session, release, temp_torrent, payload, prefs, args.verbose):
                 temp_torrent.unlink(missing_ok=True)
                 continue
 